@@ -10,6 +10,7 @@ import logging
 import pstats
 from .logger import Logger
 from .input_parser import read_config_toml, parse_config_toml
+from .thermostat import RandomBatches
 
 
 def configure_runtime(comm):
@@ -106,8 +107,10 @@ def configure_runtime(comm):
 
     if args.seed is not None:
         np.random.seed(args.seed)
+        RandomBatches.seed(args.seed)
     else:
         np.random.seed()
+        RandomBatches.seed()
 
     # Setup logger
     Logger.setup(
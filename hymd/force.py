@@ -1,7 +1,8 @@
 """Calculates intramolecular forces between bonded particles in molecules
 """
+import os
+import numba
 import numpy as np
-import networkx as nx
 from dataclasses import dataclass
 
 # Imported here so we can call from force import compute_bond_forces__fortran
@@ -57,6 +58,8 @@ class Bond:
     strength : float
         Harmonic bond strength coefficient (spring constant).
     """
+    __slots__ = ("atom_1", "atom_2", "equilibrium", "strength")
+
     atom_1: str
     atom_2: str
     equilibrium: float
@@ -111,6 +114,8 @@ class Angle(Bond):
     Bond :
         Two-particle bond type dataclass
     """
+    __slots__ = ("atom_3",)
+
     atom_3: str
 
 
@@ -205,6 +210,8 @@ class Dihedral:
     ----------
     Bore et al. J. Chem. Theory Comput., 14(2): 1120–1130, 2018.
     """
+    __slots__ = ("atom_1", "atom_2", "atom_3", "atom_4", "coeffs", "dih_type")
+
     atom_1: str
     atom_2: str
     atom_3: str
@@ -251,22 +258,369 @@ class Chi:
     hymd.hamiltonian.DefaultWithChi :
         Interaction energy functional using :math:`\\chi`-interactions.
     """
+    __slots__ = ("atom_1", "atom_2", "interaction_energy")
+
     atom_1: str
     atom_2: str
     interaction_energy: float
 
 
-def find_all_paths(G, u, n):
-    """Helper function that recursively finds all paths of given lenght 'n + 1' inside a network 'G'.
-    Adapted from https://stackoverflow.com/a/28103735."""
-    if n == 0:
-        return [[u]]
-    paths = []
-    for neighbor in G.neighbors(u):
-        for path in find_all_paths(G, neighbor, n - 1):
-            if u not in path:
-                paths.append([u] + path)
-    return paths
+def _bond_graph_csr(molecules, bonds, indices):
+    """Build a symmetric CSR adjacency of the bond graph in local indices
+
+    Parameters
+    ----------
+    molecules : (N,) numpy.ndarray
+        Array of integer molecule affiliation for each of :code:`N` particles.
+    bonds : (N,M) numpy.ndarray
+        Array of :code:`M` bonds originating from each of :code:`N` particles,
+        given in terms of global particle indices. Padded with :code:`-1`.
+    indices : (N,) numpy.ndarray
+        Array of integer global indices for each of :code:`N` particles.
+
+    Returns
+    -------
+    neighbors : (E,) numpy.ndarray
+        Local indices of all bonded neighbors, grouped by particle and ordered
+        by first appearance in :code:`bonds`.
+    offsets : (N+1,) numpy.ndarray
+        Neighbors of local particle :code:`i` are found in
+        :code:`neighbors[offsets[i]:offsets[i+1]]`.
+    """
+    n_particles = len(indices)
+    bonds = np.asarray(bonds)
+    if bonds.ndim != 2:
+        bonds = bonds.reshape(n_particles, -1 if n_particles else 0)
+    sorter = np.argsort(indices)
+    sorted_indices = np.asarray(indices)[sorter]
+
+    atom_1 = np.repeat(np.arange(n_particles), bonds.shape[1])
+    global_2 = bonds.ravel()
+    position = np.searchsorted(sorted_indices, global_2)
+    position[position == n_particles] = 0
+    atom_2 = sorter[position]
+    valid = (
+        (global_2 != -1)
+        & (sorted_indices[position] == global_2)
+        & (atom_1 != atom_2)
+    )
+    atom_1, atom_2 = atom_1[valid], atom_2[valid]
+    position = np.flatnonzero(valid)
+    same_molecule = molecules[atom_1] == molecules[atom_2]
+    atom_1, atom_2 = atom_1[same_molecule], atom_2[same_molecule]
+    position = position[same_molecule]
+
+    # Bonds may be listed on either (or both) of the participating particles.
+    # Neighbors are ordered by where the bond first appears in the bonds
+    # array, so that the graph is traversed in the same order regardless of
+    # on which particle a bond is listed.
+    source = np.concatenate((atom_1, atom_2))
+    target = np.concatenate((atom_2, atom_1))
+    position = np.concatenate((position, position))
+    order = np.lexsort((position, target, source))
+    source, target, position = source[order], target[order], position[order]
+    first = np.ones(len(source), dtype=bool)
+    first[1:] = (source[1:] != source[:-1]) | (target[1:] != target[:-1])
+    source, target, position = source[first], target[first], position[first]
+    order = np.lexsort((position, source))
+
+    offsets = np.zeros(n_particles + 1, dtype=np.int64)
+    np.cumsum(np.bincount(source, minlength=n_particles), out=offsets[1:])
+    return np.ascontiguousarray(target[order], dtype=np.int64), offsets
+
+
+def _bond_type_tables(names, config):
+    """Encode particle names and bond types as integer-indexed lookup tables
+
+    Parameters
+    ----------
+    names : (N,) numpy.ndarray
+        Array of type names for each of :code:`N` particles.
+    config : Config
+        Configuration object.
+
+    Returns
+    -------
+    type_id : (N,) numpy.ndarray
+        Integer type index for each of :code:`N` particles.
+    bond_equilibrium : (T,T) numpy.ndarray
+        Two-particle bond equilibrium distance for each pair of the :code:`T`
+        particle types present. :code:`NaN` if no bond type matches.
+    bond_strength : (T,T) numpy.ndarray
+        Two-particle bond strength for each pair of particle types.
+    angle_equilibrium : (T,T,T) numpy.ndarray
+        Three-particle bond equilibrium angle (in radians) for each triplet of
+        the :code:`T` particle types present. :code:`NaN` if no angular bond
+        type matches.
+    angle_strength : (T,T,T) numpy.ndarray
+        Three-particle bond strength for each triplet of particle types.
+    """
+    unique_names, type_id = np.unique(names, return_inverse=True)
+    name_to_id = {n.decode("UTF-8"): i for i, n in enumerate(unique_names)}
+    n_types = len(unique_names)
+
+    bond_equilibrium = np.full((n_types, n_types), np.nan, dtype=np.float64)
+    bond_strength = np.full((n_types, n_types), np.nan, dtype=np.float64)
+    for b in config.bonds:
+        if b.atom_1 not in name_to_id or b.atom_2 not in name_to_id:
+            continue
+        t1, t2 = name_to_id[b.atom_1], name_to_id[b.atom_2]
+        for ind in ((t1, t2), (t2, t1)):
+            bond_equilibrium[ind] = b.equilibrium
+            bond_strength[ind] = b.strength
+
+    angle_equilibrium = np.full(
+        (n_types, n_types, n_types), np.nan, dtype=np.float64
+    )
+    angle_strength = np.full(
+        (n_types, n_types, n_types), np.nan, dtype=np.float64
+    )
+    for a in config.angle_bonds:
+        if (
+            a.atom_1 not in name_to_id
+            or a.atom_2 not in name_to_id
+            or a.atom_3 not in name_to_id
+        ):
+            continue
+        t1 = name_to_id[a.atom_1]
+        t2 = name_to_id[a.atom_2]
+        t3 = name_to_id[a.atom_3]
+        for ind in ((t1, t2, t3), (t3, t2, t1)):
+            angle_equilibrium[ind] = np.radians(a.equilibrium)
+            angle_strength[ind] = a.strength
+
+    return (
+        type_id.astype(np.int32), bond_equilibrium, bond_strength,
+        angle_equilibrium, angle_strength,
+    )
+
+
+@numba.jit(nopython=True, cache=True)
+def _find_bonds_and_angles__numba(
+    neighbors, offsets, global_index, type_id, bond_equilibrium,
+    bond_strength, angle_equilibrium, angle_strength,
+):
+    n_particles = len(offsets) - 1
+
+    # Each bond is stored on both particles of the symmetric adjacency, and
+    # each angle is made from a distinct pair of neighbors of its middle
+    # particle, which bounds the output sizes.
+    max_bonds_2 = len(neighbors) // 2
+    max_bonds_3 = 0
+    for mid in range(n_particles):
+        degree = offsets[mid + 1] - offsets[mid]
+        max_bonds_3 += degree * (degree - 1) // 2
+
+    bonds_2_atom1 = np.empty(max_bonds_2, dtype=np.int64)
+    bonds_2_atom2 = np.empty(max_bonds_2, dtype=np.int64)
+    bonds_2_equilibrium = np.empty(max_bonds_2, dtype=np.float64)
+    bonds_2_strength = np.empty(max_bonds_2, dtype=np.float64)
+
+    bonds_3_atom1 = np.empty(max_bonds_3, dtype=np.int64)
+    bonds_3_atom2 = np.empty(max_bonds_3, dtype=np.int64)
+    bonds_3_atom3 = np.empty(max_bonds_3, dtype=np.int64)
+    bonds_3_equilibrium = np.empty(max_bonds_3, dtype=np.float64)
+    bonds_3_strength = np.empty(max_bonds_3, dtype=np.float64)
+
+    # visited[j] == i marks j as already reached from i, either directly or
+    # through an earlier middle particle.
+    visited = np.full(n_particles, -1, dtype=np.int64)
+
+    n_bonds_2 = 0
+    n_bonds_3 = 0
+    for i in range(n_particles):
+        ti = type_id[i]
+        visited[i] = i
+        for n_mid in range(offsets[i], offsets[i + 1]):
+            mid = neighbors[n_mid]
+            visited[mid] = i
+
+            # i -- mid
+            if global_index[mid] > global_index[i]:
+                t_mid = type_id[mid]
+                r0 = bond_equilibrium[ti, t_mid]
+                if not np.isnan(r0):
+                    bonds_2_atom1[n_bonds_2] = i
+                    bonds_2_atom2[n_bonds_2] = mid
+                    bonds_2_equilibrium[n_bonds_2] = r0
+                    bonds_2_strength[n_bonds_2] = bond_strength[ti, t_mid]
+                    n_bonds_2 += 1
+
+        # i -- mid -- j, for j not bonded to i and only through the first
+        # middle particle connecting them
+        for n_mid in range(offsets[i], offsets[i + 1]):
+            mid = neighbors[n_mid]
+            t_mid = type_id[mid]
+            for n_j in range(offsets[mid], offsets[mid + 1]):
+                j = neighbors[n_j]
+                if visited[j] == i:
+                    continue
+                visited[j] = i
+                if global_index[j] < global_index[i]:
+                    continue
+                tj = type_id[j]
+                theta0 = angle_equilibrium[ti, t_mid, tj]
+                if not np.isnan(theta0):
+                    bonds_3_atom1[n_bonds_3] = i
+                    bonds_3_atom2[n_bonds_3] = mid
+                    bonds_3_atom3[n_bonds_3] = j
+                    bonds_3_equilibrium[n_bonds_3] = theta0
+                    bonds_3_strength[n_bonds_3] = angle_strength[ti, t_mid, tj]
+                    n_bonds_3 += 1
+
+    return (
+        bonds_2_atom1[:n_bonds_2], bonds_2_atom2[:n_bonds_2],
+        bonds_2_equilibrium[:n_bonds_2], bonds_2_strength[:n_bonds_2],
+        bonds_3_atom1[:n_bonds_3], bonds_3_atom2[:n_bonds_3],
+        bonds_3_atom3[:n_bonds_3], bonds_3_equilibrium[:n_bonds_3],
+        bonds_3_strength[:n_bonds_3],
+    )
+
+
+def find_bonds_and_angles(molecules, names, bonds, indices, config):
+    """Find two- and three-particle bonds from connectivity information
+
+    Walks the bond connectivity provided in the structure/topology input file
+    and matches every connected pair and triplet of particles against the bond
+    types specified in the configuration. Particle names are encoded as
+    integer type indices and the bond types as dense lookup tables, so that
+    the graph traversal and matching is performed in a single compiled pass
+    without constructing intermediate Python objects.
+
+    Two-particle bonds are made between directly bonded particles.
+    Three-particle bonds are made only between particles two bonds apart,
+    i.e. along a shortest path, and only once per pair of end particles,
+    through the first shared neighbor in bond order. In rings this means that
+    a three-membered ring gives no angles, and a four-membered ring gives one
+    angle per pair of opposite particles. Each bond is oriented with the
+    lowest global index first.
+
+    Parameters
+    ----------
+    molecules : (N,) numpy.ndarray
+        Array of integer molecule affiliation for each of :code:`N` particles.
+    names : (N,) numpy.ndarray
+        Array of type names for each of :code:`N` particles.
+    bonds : (N,M) numpy.ndarray
+        Array of :code:`M` bonds originating from each of :code:`N` particles.
+    indices : (N,) numpy.ndarray
+        Array of integer global indices for each of :code:`N` particles.
+    config : Config
+        Configuration object.
+
+    Returns
+    -------
+    bonds_2_atom_1, bonds_2_atom_2 : (B,) numpy.ndarray
+        Local indices of particle 1 and 2 for each of :code:`B` constructed
+        two-particle bonds.
+    bonds_2_equilibrium, bonds_2_strength : (B,) numpy.ndarray
+        Equilibrium distance and bond strength for each two-particle bond.
+    bonds_3_atom_1, bonds_3_atom_2, bonds_3_atom_3 : (A,) numpy.ndarray
+        Local indices of particle 1, 2, and 3 for each of :code:`A`
+        constructed three-particle bonds.
+    bonds_3_equilibrium, bonds_3_strength : (A,) numpy.ndarray
+        Equilibrium angle (in radians) and bond strength for each
+        three-particle bond.
+
+    See also
+    --------
+    prepare_bonds :
+        Assembles the full set of bonded interaction arrays.
+    """
+    neighbors, offsets = _bond_graph_csr(molecules, bonds, indices)
+    tables = _bond_type_tables(names, config)
+    return _find_bonds_and_angles__numba(
+        neighbors, offsets, np.asarray(indices, dtype=np.int64), *tables
+    )
+
+
+def _find_dihedrals(molecules, names, bonds, indices, config):
+    """Find four-particle bonds from connectivity and dihedral types
+
+    The connectivity of each molecule is walked directly from the
+    :code:`bonds` array. The particles are grouped by molecule once, in order
+    of increasing molecule index, so that the cost is linear in the number of
+    particles. Within a molecule, particles and their neighbors are visited in
+    the order in which they first appear in the bond lists, and each simple
+    path of four particles is matched to the dihedral types. A path whose
+    reverse has already been matched to the same dihedral type is skipped.
+
+    Returns
+    -------
+    bonds_4 :
+        List of lists containing *local* particle indices, dihedral type index,
+        and dihedral coefficients for each reconstructed four-particle
+        torsional bond.
+    bb_index : list
+        List indicating the dihedral type of each four-particle bond in
+        :code:`bonds_4`.
+    """
+    bonds_4 = []
+    bb_index = []
+    if not config.dihedrals:
+        return bonds_4, bb_index
+
+    dihedral_types = {}
+    for t, a in enumerate(config.dihedrals):
+        key = (a.atom_1, a.atom_2, a.atom_3, a.atom_4)
+        dihedral_types.setdefault(key, []).append((t, a))
+    global_to_local = {
+        g: local for local, g in enumerate(np.asarray(indices).tolist())
+    }
+    str_names = [n.decode("UTF-8") for n in names]
+
+    molecules = np.asarray(molecules)
+    order = np.argsort(molecules, kind="stable")
+    boundaries = np.flatnonzero(np.diff(molecules[order])) + 1
+    molecule_list = molecules.tolist()
+    bonds_list = np.asarray(bonds).tolist()
+
+    for group in np.split(order, boundaries):
+        group = group.tolist()
+        if not group:
+            continue
+        mol = molecule_list[group[0]]
+        bb_dihedral = 0
+        found = set()
+
+        neighbors = {}
+        for local_index in group:
+            neighbors.setdefault(local_index, [])
+            for bond in bonds_list[local_index]:
+                j = global_to_local.get(bond)
+                if bond == -1 or j is None or molecule_list[j] != mol:
+                    continue
+                neighbors.setdefault(j, [])
+                if j != local_index and j not in neighbors[local_index]:
+                    neighbors[local_index].append(j)
+                    neighbors[j].append(local_index)
+
+        for i, neighbors_i in neighbors.items():
+            for mid_1 in neighbors_i:
+                for mid_2 in neighbors[mid_1]:
+                    if mid_2 == i:
+                        continue
+                    for j in neighbors[mid_2]:
+                        if j == i or j == mid_1:
+                            continue
+                        key = (
+                            str_names[i], str_names[mid_1], str_names[mid_2],
+                            str_names[j],
+                        )
+                        for t, a in dihedral_types.get(key, ()):
+                            if (j, mid_2, mid_1, i, t) in found:
+                                continue
+                            found.add((i, mid_1, mid_2, j, t))
+                            bonds_4.append(
+                                [i, mid_1, mid_2, j, a.coeffs, a.dih_type]
+                            )
+                            if a.dih_type == 1:
+                                bb_dihedral = len(bonds_4)
+
+        if bb_dihedral:
+            bb_index.append(bb_dihedral - 1)
+
+    return bonds_4, bb_index
 
 
 def prepare_bonds_old(molecules, names, bonds, indices, config):
@@ -287,8 +641,8 @@ def prepare_bonds_old(molecules, names, bonds, indices, config):
     four particles, a matching to bond types is attempted. If the corresponding
     names match, a bond object is initialized.
 
-    In order to investigate the connectivity, a graph is created using
-    networkx functionality.
+    Two- and three-particle bonds are found by :code:`find_bonds_and_angles`,
+    and four-particle bonds by walking the connectivity of each molecule.
 
     Parameters
     ----------
@@ -336,132 +690,38 @@ def prepare_bonds_old(molecules, names, bonds, indices, config):
     hymd.input_parser.Config
         Configuration dataclass handler.
     """
-    bonds_2 = []
-    bonds_3 = []
-    bonds_4 = []
-    bb_index = []
-
-    different_molecules = np.unique(molecules)
-    for mol in different_molecules:
-        bb_dihedral = 0
-        bond_graph = nx.Graph()
-
-        for local_index, global_index in enumerate(indices):
-            if molecules[local_index] != mol:
-                continue
-
-            bond_graph.add_node(
-                global_index,
-                name=names[local_index].decode("UTF-8"),
-                local_index=local_index,
-            )
-            for bond in [b for b in bonds[local_index] if b != -1]:
-                bond_graph.add_edge(global_index, bond)
-
-        connectivity = nx.all_pairs_shortest_path(bond_graph)
-        for c in connectivity:
-            i = c[0]
-            connected = c[1]
-            for j, path in connected.items():
-                if len(path) == 2 and path[-1] > path[0]:
-                    name_i = bond_graph.nodes()[i]["name"]
-                    name_j = bond_graph.nodes()[j]["name"]
-
-                    for b in config.bonds:
-                        match_forward = (
-                            name_i == b.atom_1 and name_j == b.atom_2
-                        )
-                        match_backward = (
-                            name_i == b.atom_2 and name_j == b.atom_1
-                        )
-                        if match_forward or match_backward:
-                            bonds_2.append(
-                                [
-                                    bond_graph.nodes()[i]["local_index"],
-                                    bond_graph.nodes()[j]["local_index"],
-                                    b.equilibrium,
-                                    b.strength,
-                                ]
-                            )
-
-                if len(path) == 3 and path[-1] > path[0]:
-                    name_i = bond_graph.nodes()[i]["name"]
-                    name_mid = bond_graph.nodes()[path[1]]["name"]
-                    name_j = bond_graph.nodes()[j]["name"]
-
-                    for a in config.angle_bonds:
-                        match_forward = (
-                            name_i == a.atom_1
-                            and name_mid == a.atom_2
-                            and name_j == a.atom_3
-                        )
-                        match_backward = (
-                            name_i == a.atom_3
-                            and name_mid == a.atom_2
-                            and name_j == a.atom_1
-                        )
-                        if match_forward or match_backward:
-                            bonds_3.append(
-                                [
-                                    bond_graph.nodes()[i]["local_index"],
-                                    bond_graph.nodes()[path[1]]["local_index"],
-                                    bond_graph.nodes()[j]["local_index"],
-                                    np.radians(a.equilibrium),
-                                    a.strength,
-                                ]
-                            )
-
-            all_paths_len_four = find_all_paths(bond_graph, i, 3)
-            for p in all_paths_len_four:
-                name_i = bond_graph.nodes()[i]["name"]
-                name_mid_1 = bond_graph.nodes()[p[1]]["name"]
-                name_mid_2 = bond_graph.nodes()[p[2]]["name"]
-                name_j = bond_graph.nodes()[p[3]]["name"]
-
-                for a in config.dihedrals:
-                    match_forward = (
-                        name_i == a.atom_1
-                        and name_mid_1 == a.atom_2
-                        and name_mid_2 == a.atom_3
-                        and name_j == a.atom_4
-                    )
-                    if (
-                        match_forward
-                        and [
-                            bond_graph.nodes()[p[3]]["local_index"],
-                            bond_graph.nodes()[p[2]]["local_index"],
-                            bond_graph.nodes()[p[1]]["local_index"],
-                            bond_graph.nodes()[i]["local_index"],
-                            a.coeffs,
-                            a.dih_type,
-                        ]
-                        not in bonds_4
-                    ):
-                        bonds_4.append(
-                            [
-                                bond_graph.nodes()[i]["local_index"],
-                                bond_graph.nodes()[p[1]]["local_index"],
-                                bond_graph.nodes()[p[2]]["local_index"],
-                                bond_graph.nodes()[p[3]]["local_index"],
-                                a.coeffs,
-                                a.dih_type,
-                            ]
-                        )
-                        if a.dih_type == 1:
-                            bb_dihedral = len(bonds_4)
-
-        if bb_dihedral:
-            bb_index.append(bb_dihedral - 1)
-
+    (
+        bonds_2_atom1, bonds_2_atom2, bonds_2_equilibrium, bonds_2_strength,
+        bonds_3_atom1, bonds_3_atom2, bonds_3_atom3, bonds_3_equilibrium,
+        bonds_3_strength,
+    ) = find_bonds_and_angles(molecules, names, bonds, indices, config)
+    bonds_2 = [
+        list(b) for b in zip(
+            bonds_2_atom1.tolist(), bonds_2_atom2.tolist(),
+            bonds_2_equilibrium.tolist(), bonds_2_strength.tolist(),
+        )
+    ]
+    bonds_3 = [
+        list(b) for b in zip(
+            bonds_3_atom1.tolist(), bonds_3_atom2.tolist(),
+            bonds_3_atom3.tolist(), bonds_3_equilibrium.tolist(),
+            bonds_3_strength.tolist(),
+        )
+    ]
+    bonds_4, bb_index = _find_dihedrals(
+        molecules, names, bonds, indices, config
+    )
     return bonds_2, bonds_3, bonds_4, bb_index
 
 
 def prepare_bonds(molecules, names, bonds, indices, config):
     """Rearrange the bond information for usage in compiled Fortran kernels
 
-    Restructures the lists resulting from the execution of
-    :code:`prepare_bonds_old` into numpy arrays suitable for calls to optimized
-    Fortran code calculating bonded forces and energiesself.
+    Collects the bonded interactions found from the connectivity information
+    into numpy arrays suitable for calls to optimized Fortran code calculating
+    bonded forces and energies. The two- and three-particle bond arrays are
+    emitted directly by :code:`find_bonds_and_angles`, while the four-particle
+    bonds are restructured from lists into arrays.
 
     Parameters
     ----------
@@ -533,58 +793,46 @@ def prepare_bonds(molecules, names, bonds, indices, config):
 
     See also
     --------
-    prepare_bonds_old :
-        Used internally to reconstruct the bonded interactions types from the
-        connectivity information in the structure/topology input file and the
-        bonded types specified in the configuration file.
+    find_bonds_and_angles :
+        Used internally to reconstruct the two- and three-particle bonded
+        interactions from the connectivity information in the
+        structure/topology input file and the bonded types specified in the
+        configuration file.
     """
-    bonds_2, bonds_3, bonds_4, bb_index = prepare_bonds_old(
+    (
+        bonds_2_atom1, bonds_2_atom2, bonds_2_equilibrium, bonds_2_strength,
+        bonds_3_atom1, bonds_3_atom2, bonds_3_atom3, bonds_3_equilibrium,
+        bonds_3_strength,
+    ) = find_bonds_and_angles(molecules, names, bonds, indices, config)
+    bonds_4, bb_index = _find_dihedrals(
         molecules, names, bonds, indices, config
     )
 
-    # Bonds
-    bonds_2_atom1 = np.empty(len(bonds_2), dtype=int)
-    bonds_2_atom2 = np.empty(len(bonds_2), dtype=int)
-    bonds_2_equilibrium = np.empty(len(bonds_2), dtype=np.float64)
-    bonds_2_strength = np.empty(len(bonds_2), dtype=np.float64)
-    for i, b in enumerate(bonds_2):
-        bonds_2_atom1[i] = b[0]
-        bonds_2_atom2[i] = b[1]
-        bonds_2_equilibrium[i] = b[2]
-        bonds_2_strength[i] = b[3]
-
-    # Angles
-    bonds_3_atom1 = np.empty(len(bonds_3), dtype=int)
-    bonds_3_atom2 = np.empty(len(bonds_3), dtype=int)
-    bonds_3_atom3 = np.empty(len(bonds_3), dtype=int)
-    bonds_3_equilibrium = np.empty(len(bonds_3), dtype=np.float64)
-    bonds_3_strength = np.empty(len(bonds_3), dtype=np.float64)
-    for i, b in enumerate(bonds_3):
-        bonds_3_atom1[i] = b[0]
-        bonds_3_atom2[i] = b[1]
-        bonds_3_atom3[i] = b[2]
-        bonds_3_equilibrium[i] = b[3]
-        bonds_3_strength[i] = b[4]
+    # Two-particle bonds are found in order of the first particle already.
+    # Sort angles by the central particle, which is shared between most
+    # consecutive angles, to keep its position and force entries in cache.
+    order = np.argsort(bonds_3_atom2, kind="stable")
+    bonds_3_atom1 = bonds_3_atom1[order]
+    bonds_3_atom2 = bonds_3_atom2[order]
+    bonds_3_atom3 = bonds_3_atom3[order]
+    bonds_3_equilibrium = bonds_3_equilibrium[order]
+    bonds_3_strength = bonds_3_strength[order]
 
     # Dihedrals
-    bonds_4_atom1 = np.empty(len(bonds_4), dtype=int)
-    bonds_4_atom2 = np.empty(len(bonds_4), dtype=int)
-    bonds_4_atom3 = np.empty(len(bonds_4), dtype=int)
-    bonds_4_atom4 = np.empty(len(bonds_4), dtype=int)
     number_of_coeff = 6
     len_of_coeff = 5
-    bonds_4_coeff = np.empty(
-        (len(bonds_4), number_of_coeff, len_of_coeff), dtype=np.float64
-    )
-    bonds_4_type = np.empty(len(bonds_4), dtype=int)
+    bonds_4_columns = np.asarray(
+        [b[:4] + [b[5]] for b in bonds_4], dtype=int
+    ).reshape(-1, 5)
+    (
+        bonds_4_atom1, bonds_4_atom2, bonds_4_atom3, bonds_4_atom4,
+        bonds_4_type,
+    ) = np.ascontiguousarray(bonds_4_columns.T)
+    bonds_4_coeff = np.asarray(
+        [np.resize(b[4], (number_of_coeff, len_of_coeff)) for b in bonds_4],
+        dtype=np.float64,
+    ).reshape(-1, number_of_coeff, len_of_coeff)
     bonds_4_last = np.zeros(len(bonds_4), dtype=int)
-    for i, b in enumerate(bonds_4):
-        bonds_4_atom1[i] = b[0]
-        bonds_4_atom2[i] = b[1]
-        bonds_4_atom3[i] = b[2]
-        bonds_4_atom4[i] = b[3]
-        bonds_4_coeff[i] = np.resize(b[4], (number_of_coeff, len_of_coeff))
-        bonds_4_type[i] = b[5]
     bonds_4_last[bb_index] = 1
 
     return (
@@ -594,80 +842,621 @@ def prepare_bonds(molecules, names, bonds, indices, config):
     )
 
 
-def compute_bond_forces__plain(f_bonds, r, bonds_2, box_size):
-    """Computes forces resulting from bonded interactions
+class ThreadForceBuffers:
+    """Per-thread force buffers reused by the parallel numba kernels
 
-    .. deprecated:: 1.0.0
-        :code:`compute_bond_forces__plain` was replaced by compiled Fortran
-        code prior to 1.0.0 release.
+    The buffers are kept in one flat array for each data type, which is only
+    reallocated when a larger buffer is requested, so that changes in the
+    number of local particles between steps do not trigger new allocations.
+    The contents are not initialized; the kernels zero the parts they use.
+    """
+    _buffers = {}
+
+    @classmethod
+    def get(cls, n_chunks, n_particles, dtype):
+        """Return an uninitialized buffer of shape (n_chunks, 3, n_particles)
+
+        Parameters
+        ----------
+        n_chunks : int
+            Number of thread-private chunks.
+        n_particles : int
+            Number of particles.
+        dtype : numpy.dtype
+            Data type of the buffer.
+
+        Returns
+        -------
+        f_local : (n_chunks, 3, n_particles) numpy.ndarray
+            C-contiguous view into the reused buffer.
+        """
+        dtype = np.dtype(dtype)
+        size = n_chunks * 3 * n_particles
+        buffer = cls._buffers.get(dtype)
+        if buffer is None or buffer.size < size:
+            buffer = np.empty(size, dtype=dtype)
+            cls._buffers[dtype] = buffer
+        return buffer[:size].reshape(n_chunks, 3, n_particles)
+
+
+def _thread_chunks(n_threads, n_bonds, n_particles, dtype):
+    """Per-thread force buffers for splitting :code:`n_bonds` bonds
+
+    A single chunk is written directly into the output force arrays, in which
+    case an empty buffer is returned.
+    """
+    n_chunks = min(n_threads, max(n_bonds, 1))
+    if n_chunks == 1:
+        n_particles = 0
+    return ThreadForceBuffers.get(n_chunks, n_particles, dtype)
+
+
+@numba.jit(nopython=True, cache=True)
+def _touched_range(start, stop, p1, p2, p3):
+    """Range of particle indices :code:`[lo, hi)` in bonds start to stop"""
+    if start >= stop:
+        return 0, 0
+    lo = p1[start]
+    hi = p1[start]
+    for ind in range(start, stop):
+        lo = min(lo, p1[ind], p2[ind], p3[ind])
+        hi = max(hi, p1[ind], p2[ind], p3[ind])
+    return lo, hi + 1
+
+
+@numba.jit(nopython=True, parallel=True, cache=True)
+def _reduce_force_buffers(f_x, f_y, f_z, f_local, lo, hi):
+    """Sum per-thread force buffers :code:`f_local` of shape (T, 3, N)
+
+    Only the particle range :code:`[lo[c], hi[c])` of chunk :code:`c` is
+    summed, since the chunks only touch (and zero) that range.
+    """
+    for i in numba.prange(len(f_x)):
+        f_x[i] = 0.0
+        f_y[i] = 0.0
+        f_z[i] = 0.0
+    for c in range(f_local.shape[0]):
+        for i in numba.prange(lo[c], hi[c]):
+            f_x[i] += f_local[c, 0, i]
+            f_y[i] += f_local[c, 1, i]
+            f_z[i] += f_local[c, 2, i]
+
+
+@numba.jit(nopython=True, fastmath=True, cache=True)
+def _bond_forces_range(
+    f_bx, f_by, f_bz, rx, ry, rz, Lx, Ly, Lz, a1, a2, r0, k, start, stop,
+):
+    """Accumulate two-particle bond forces for bonds :code:`start:stop`
+
+    Returns the energy of the bonds in the range; see
+    :code:`compute_bond_forces__numba` for the arguments.
     """
-    f_bonds.fill(0.0)
     energy = 0.0
+    inv_Lx = 1.0 / Lx
+    inv_Ly = 1.0 / Ly
+    inv_Lz = 1.0 / Lz
+
+    for ind in range(start, stop):
+        i = a1[ind]
+        j = a2[ind]
 
-    for i, j, r0, k in bonds_2:
-        ri = r[i, :]
-        rj = r[j, :]
-        rij = rj - ri
+        dx = np.float64(rx[j]) - np.float64(rx[i])
+        dy = np.float64(ry[j]) - np.float64(ry[i])
+        dz = np.float64(rz[j]) - np.float64(rz[i])
 
         # Apply periodic boundary conditions to the distance rij
-        for dim in range(len(rij)):
-            rij[dim] -= box_size[dim] * np.around(rij[dim] / box_size[dim])
-        dr = np.linalg.norm(rij)
-        df = -k * (dr - r0)
-        f_bond_vector = df * rij / dr
-        f_bonds[i, :] -= f_bond_vector
-        f_bonds[j, :] += f_bond_vector
-
-        energy += 0.5 * k * (dr - r0) ** 2
+        dx -= Lx * np.rint(dx * inv_Lx)
+        dy -= Ly * np.rint(dy * inv_Ly)
+        dz -= Lz * np.rint(dz * inv_Lz)
+
+        dr = np.sqrt(dx * dx + dy * dy + dz * dz)
+        df = -k[ind] * (dr - r0[ind])
+        inv_dr = 1.0 / dr
+
+        fx = df * dx * inv_dr
+        fy = df * dy * inv_dr
+        fz = df * dz * inv_dr
+        f_bx[i] -= fx
+        f_by[i] -= fy
+        f_bz[i] -= fz
+        f_bx[j] += fx
+        f_by[j] += fy
+        f_bz[j] += fz
+
+        energy += 0.5 * k[ind] * (dr - r0[ind]) ** 2
     return energy
 
 
-def compute_angle_forces__plain(f_angles, r, bonds_3, box_size):
-    """Computes forces resulting from angular interactions
+def compute_bond_forces__numba(
+    f_bx, f_by, f_bz, rx, ry, rz, Lx, Ly, Lz, a1, a2, r0, k,
+):
+    """Compute two-particle bond forces and energy
+
+    Positions and forces are given as separate contiguous arrays for each
+    Cartesian component (structure of arrays), so that the loop only performs
+    scalar arithmetic without creating temporary arrays. The positions may be
+    stored in single precision, in which case they are converted to double
+    precision before the distance vectors are formed. Forces are accumulated
+    in the data type of the force arrays. The bonds are split into one
+    contiguous chunk per thread, each accumulating into a private force buffer
+    which are summed at the end. The buffers are reused between calls, and
+    only the range of particles touched by each chunk is zeroed and summed,
+    which is small when the bonds are ordered by particle index as returned
+    by :code:`find_bonds_and_angles`.
 
-    .. deprecated:: 1.0.0
-        :code:`compute_angle_forces__plain` was replaced by compiled Fortran
-        code prior to 1.0.0 release.
+    Parameters
+    ----------
+    f_bx, f_by, f_bz : (N,) numpy.ndarray
+        Cartesian components of the bond forces on each of :code:`N`
+        particles. Changed in place.
+    rx, ry, rz : (N,) numpy.ndarray
+        Cartesian components of the positions of each of :code:`N` particles.
+    Lx, Ly, Lz : float
+        Simulation box size.
+    a1, a2 : (M,) numpy.ndarray
+        Local index of particle 1 and 2 for each of :code:`M` two-particle
+        bonds.
+    r0, k : (M,) numpy.ndarray
+        Equilibrium distance and bond strength for each of :code:`M`
+        two-particle bonds.
+
+    Returns
+    -------
+    energy : float
+        Total energy of all two-particle bonds.
     """
-    f_angles.fill(0.0)
-    energy = 0.0
+    f_local = _thread_chunks(
+        numba.get_num_threads(), len(a1), len(rx), f_bx.dtype,
+    )
+    return _bond_forces_parallel(
+        f_bx, f_by, f_bz, rx, ry, rz, Lx, Ly, Lz, a1, a2, r0, k, f_local,
+    )
 
-    for a, b, c, theta0, k in bonds_3:
-        ra = r[a, :] - r[b, :]
-        rc = r[c, :] - r[b, :]
 
-        for dim in range(len(ra)):
-            ra[dim] -= box_size[dim] * np.around(ra[dim] / box_size[dim])
-            rc[dim] -= box_size[dim] * np.around(rc[dim] / box_size[dim])
+@numba.jit(nopython=True, fastmath=True, parallel=True, cache=True)
+def _bond_forces_parallel(
+    f_bx, f_by, f_bz, rx, ry, rz, Lx, Ly, Lz, a1, a2, r0, k, f_local,
+):
+    """Parallel part of :code:`compute_bond_forces__numba`
 
-        xra = 1.0 / np.sqrt(np.dot(ra, ra))
-        xrc = 1.0 / np.sqrt(np.dot(rc, rc))
-        ea = ra * xra
-        ec = rc * xrc
+    The work is split into one chunk for each of the uninitialized per-thread
+    force buffers :code:`f_local`. These are allocated by the caller, as
+    querying the thread count here would prevent caching the compiled
+    function.
+    """
+    n_chunks = f_local.shape[0]
+    if n_chunks == 1:
+        f_bx[:] = 0.0
+        f_by[:] = 0.0
+        f_bz[:] = 0.0
+        return _bond_forces_range(
+            f_bx, f_by, f_bz, rx, ry, rz, Lx, Ly, Lz, a1, a2, r0, k,
+            0, len(a1),
+        )
+
+    chunk = (len(a1) + n_chunks - 1) // n_chunks
+    energy_local = np.zeros(n_chunks, dtype=np.float64)
+    lo = np.zeros(n_chunks, dtype=np.int64)
+    hi = np.zeros(n_chunks, dtype=np.int64)
+
+    for c in numba.prange(n_chunks):
+        start = min(c * chunk, len(a1))
+        stop = min((c + 1) * chunk, len(a1))
+        lo[c], hi[c] = _touched_range(start, stop, a1, a2, a2)
+        f_local[c, :, lo[c]:hi[c]] = 0.0
+        energy_local[c] = _bond_forces_range(
+            f_local[c, 0], f_local[c, 1], f_local[c, 2], rx, ry, rz,
+            Lx, Ly, Lz, a1, a2, r0, k, start, stop,
+        )
+    _reduce_force_buffers(f_bx, f_by, f_bz, f_local, lo, hi)
+    return energy_local.sum()
+
+
+@numba.jit(nopython=True, fastmath=True, cache=True)
+def _acos_poly(x):
+    """Polynomial approximation of :code:`arccos(x)`
+
+    Uses the seventh order approximation of Abramowitz and Stegun (4.4.46),
+    :math:`\\cos^{-1}(x) \\approx \\sqrt{1-x}\\sum_{n=0}^7 a_n x^n` for
+    :math:`0\\leq x\\leq 1`, reflected for negative :math:`x`. The absolute
+    error is below :math:`2\\cdot 10^{-8}`.
 
-        cosphi = np.dot(ea, ec)
-        theta = np.arccos(cosphi)
-        xsinph = 1.0 / np.sqrt(1.0 - cosphi ** 2)
+    References
+    ----------
+    M. Abramowitz and I. A. Stegun, Handbook of Mathematical Functions (Dover,
+    New York, 1972), p. 81.
+    """
+    y = abs(x)
+    p = -0.0012624911
+    p = p * y + 0.0066700901
+    p = p * y - 0.0170881256
+    p = p * y + 0.0308918810
+    p = p * y - 0.0501743046
+    p = p * y + 0.0889789874
+    p = p * y - 0.2145988016
+    p = p * y + 1.5707963050
+    acos_y = np.sqrt(1.0 - y) * p
+    if x < 0.0:
+        return np.pi - acos_y
+    return acos_y
+
+
+@numba.jit(nopython=True, fastmath=True, cache=True)
+def _angle_forces_range(
+    f_ax, f_ay, f_az, rx, ry, rz, Lx, Ly, Lz, a1, a2, a3, t0, k, fast_acos,
+    start, stop,
+):
+    """Accumulate three-particle bond forces for angles :code:`start:stop`
 
-        d = theta - theta0
-        f = -k * d
+    Returns the energy of the angles in the range; see
+    :code:`compute_angle_forces__numba` for the arguments.
+    """
+    energy = 0.0
+    inv_Lx = 1.0 / Lx
+    inv_Ly = 1.0 / Ly
+    inv_Lz = 1.0 / Lz
+
+    for ind in range(start, stop):
+        a = a1[ind]
+        b = a2[ind]
+        c = a3[ind]
+
+        rax = np.float64(rx[a]) - np.float64(rx[b])
+        ray = np.float64(ry[a]) - np.float64(ry[b])
+        raz = np.float64(rz[a]) - np.float64(rz[b])
+        rcx = np.float64(rx[c]) - np.float64(rx[b])
+        rcy = np.float64(ry[c]) - np.float64(ry[b])
+        rcz = np.float64(rz[c]) - np.float64(rz[b])
+
+        rax -= Lx * np.rint(rax * inv_Lx)
+        ray -= Ly * np.rint(ray * inv_Ly)
+        raz -= Lz * np.rint(raz * inv_Lz)
+        rcx -= Lx * np.rint(rcx * inv_Lx)
+        rcy -= Ly * np.rint(rcy * inv_Ly)
+        rcz -= Lz * np.rint(rcz * inv_Lz)
+
+        xra = (rax * rax + ray * ray + raz * raz) ** -0.5
+        xrc = (rcx * rcx + rcy * rcy + rcz * rcz) ** -0.5
+        eax = rax * xra
+        eay = ray * xra
+        eaz = raz * xra
+        ecx = rcx * xrc
+        ecy = rcy * xrc
+        ecz = rcz * xrc
+
+        cosphi = eax * ecx + eay * ecy + eaz * ecz
+        cosphi2 = cosphi * cosphi
+        if cosphi2 >= 1.0:
+            continue
+        if fast_acos:
+            theta = _acos_poly(cosphi)
+        else:
+            theta = np.arccos(cosphi)
+        xsinph = (1.0 - cosphi2) ** -0.5
+
+        d = theta - t0[ind]
+        f = -k[ind] * d
 
         xrasin = xra * xsinph * f
         xrcsin = xrc * xsinph * f
 
-        fa = (ea * cosphi - ec) * xrasin
-        fc = (ec * cosphi - ea) * xrcsin
-
-        f_angles[a, :] += fa
-        f_angles[c, :] += fc
-        f_angles[b, :] -= fa + fc
-        # f_angles[b, :] += -(fa + fc)
+        fax = (eax * cosphi - ecx) * xrasin
+        fay = (eay * cosphi - ecy) * xrasin
+        faz = (eaz * cosphi - ecz) * xrasin
+        fcx = (ecx * cosphi - eax) * xrcsin
+        fcy = (ecy * cosphi - eay) * xrcsin
+        fcz = (ecz * cosphi - eaz) * xrcsin
+
+        f_ax[a] += fax
+        f_ay[a] += fay
+        f_az[a] += faz
+        f_ax[c] += fcx
+        f_ay[c] += fcy
+        f_az[c] += fcz
+        f_ax[b] -= fax + fcx
+        f_ay[b] -= fay + fcy
+        f_az[b] -= faz + fcz
 
         energy -= 0.5 * f * d
+    return energy
+
+
+def compute_angle_forces__numba(
+    f_ax, f_ay, f_az, rx, ry, rz, Lx, Ly, Lz, a1, a2, a3, t0, k,
+    fast_acos=False,
+):
+    """Compute three-particle bond forces and energy
+
+    Positions and forces are given as separate contiguous arrays for each
+    Cartesian component (structure of arrays), so that the loop only performs
+    scalar arithmetic without creating temporary arrays. The positions may be
+    stored in single precision, in which case they are converted to double
+    precision before the distance vectors are formed. Forces are accumulated
+    in the data type of the force arrays. The angles are split into
+    thread-private chunks as in :code:`compute_bond_forces__numba`.
+
+    Parameters
+    ----------
+    f_ax, f_ay, f_az : (N,) numpy.ndarray
+        Cartesian components of the angle forces on each of :code:`N`
+        particles. Changed in place.
+    rx, ry, rz : (N,) numpy.ndarray
+        Cartesian components of the positions of each of :code:`N` particles.
+    Lx, Ly, Lz : float
+        Simulation box size.
+    a1, a2, a3 : (M,) numpy.ndarray
+        Local index of particle 1, 2 (central), and 3 for each of :code:`M`
+        three-particle bonds.
+    t0, k : (M,) numpy.ndarray
+        Equilibrium angle and bond strength for each of :code:`M`
+        three-particle bonds.
+    fast_acos : bool, optional
+        If True, the angles are computed with the polynomial approximation
+        :code:`_acos_poly` instead of :code:`numpy.arccos`.
+
+    Returns
+    -------
+    energy : float
+        Total energy of all three-particle bonds.
+    """
+    f_local = _thread_chunks(
+        numba.get_num_threads(), len(a1), len(rx), f_ax.dtype,
+    )
+    return _angle_forces_parallel(
+        f_ax, f_ay, f_az, rx, ry, rz, Lx, Ly, Lz, a1, a2, a3, t0, k, fast_acos,
+        f_local,
+    )
+
+
+@numba.jit(nopython=True, fastmath=True, parallel=True, cache=True)
+def _angle_forces_parallel(
+    f_ax, f_ay, f_az, rx, ry, rz, Lx, Ly, Lz, a1, a2, a3, t0, k, fast_acos,
+    f_local,
+):
+    """Parallel part of :code:`compute_angle_forces__numba`
+
+    The work is split into one chunk for each of the per-thread force buffers
+    :code:`f_local`, as in :code:`_bond_forces_parallel`.
+    """
+    n_chunks = f_local.shape[0]
+    if n_chunks == 1:
+        f_ax[:] = 0.0
+        f_ay[:] = 0.0
+        f_az[:] = 0.0
+        return _angle_forces_range(
+            f_ax, f_ay, f_az, rx, ry, rz, Lx, Ly, Lz, a1, a2, a3, t0, k,
+            fast_acos, 0, len(a1),
+        )
+
+    chunk = (len(a1) + n_chunks - 1) // n_chunks
+    energy_local = np.zeros(n_chunks, dtype=np.float64)
+    lo = np.zeros(n_chunks, dtype=np.int64)
+    hi = np.zeros(n_chunks, dtype=np.int64)
+
+    for c in numba.prange(n_chunks):
+        start = min(c * chunk, len(a1))
+        stop = min((c + 1) * chunk, len(a1))
+        lo[c], hi[c] = _touched_range(start, stop, a1, a2, a3)
+        f_local[c, :, lo[c]:hi[c]] = 0.0
+        energy_local[c] = _angle_forces_range(
+            f_local[c, 0], f_local[c, 1], f_local[c, 2], rx, ry, rz,
+            Lx, Ly, Lz, a1, a2, a3, t0, k, fast_acos, start, stop,
+        )
+    _reduce_force_buffers(f_ax, f_ay, f_az, f_local, lo, hi)
+    return energy_local.sum()
+
+
+def _use_numba_kernels(r):
+    """Decide whether the numba kernels should be used for the bonded forces
+
+    The compiled Fortran kernels are used by default. The numba kernels are
+    used if the :code:`HYMD_FORCE_BACKEND` environment variable is set to
+    :code:`numba`, or if the position array data type is not supported by
+    the Fortran kernels (neither :code:`float32` nor :code:`float64`).
+    """
+    backend = os.environ.get("HYMD_FORCE_BACKEND", "fortran").lower()
+    return backend == "numba" or r.dtype not in (np.float32, np.float64)
+
+
+def compute_bond_forces(
+    f_bonds, r, box_size, bonds_2_atom1, bonds_2_atom2, bonds_2_equilibrium,
+    bonds_2_strength,
+):
+    """Compute two-particle bond forces and energy
 
+    Dispatches to the single or double precision Fortran kernel depending on
+    the data type of :code:`r`, or to :code:`compute_bond_forces__numba`. The
+    numba kernel always computes and accumulates the forces in double
+    precision, i.e. single precision positions are used in mixed precision.
+
+    Parameters
+    ----------
+    f_bonds : (N,D) numpy.ndarray
+        Forces for N particles in D dimensions. Changed in place.
+    r : (N,D) numpy.ndarray
+        Positions for N particles in D dimensions.
+    box_size : (D,) numpy.ndarray
+        D-dimensional simulation box size.
+    bonds_2_atom1, bonds_2_atom2 : (M,) numpy.ndarray
+        Local index of particle 1 and 2 for each of :code:`M` two-particle
+        bonds.
+    bonds_2_equilibrium, bonds_2_strength : (M,) numpy.ndarray
+        Equilibrium distance and bond strength for each of :code:`M`
+        two-particle bonds.
+
+    Returns
+    -------
+    energy : float
+        Total energy of all two-particle bonds.
+
+    See also
+    --------
+    prepare_bonds :
+        Constructs the bond arrays passed to this function.
+    """
+    if not _use_numba_kernels(r):
+        if r.dtype == np.float64:
+            kernel = compute_bond_forces__fortran__double
+        else:
+            kernel = compute_bond_forces__fortran
+        return kernel(
+            f_bonds, r, box_size, bonds_2_atom1, bonds_2_atom2,
+            bonds_2_equilibrium, bonds_2_strength,
+        )
+
+    f = [np.empty(len(r), dtype=np.float64) for _ in range(3)]
+    energy = compute_bond_forces__numba(
+        *f, *(np.ascontiguousarray(r[:, d]) for d in range(3)),
+        *(float(L) for L in box_size), bonds_2_atom1, bonds_2_atom2,
+        bonds_2_equilibrium, bonds_2_strength,
+    )
+    for d in range(3):
+        f_bonds[:, d] = f[d]
     return energy
 
 
+def compute_angle_forces(
+    f_angles, r, box_size, bonds_3_atom1, bonds_3_atom2, bonds_3_atom3,
+    bonds_3_equilibrium, bonds_3_strength,
+):
+    """Compute three-particle bond forces and energy
+
+    Dispatches to the single or double precision Fortran kernel depending on
+    the data type of :code:`r`, or to :code:`compute_angle_forces__numba`.
+    Like :code:`compute_bond_forces`, the numba kernel accumulates in double
+    precision for any position data type. With the numba kernel, setting the
+    :code:`HYMD_FAST_ACOS` environment variable to :code:`1` replaces
+    :code:`numpy.arccos` by a polynomial approximation.
+
+    Parameters
+    ----------
+    f_angles : (N,D) numpy.ndarray
+        Forces for N particles in D dimensions. Changed in place.
+    r : (N,D) numpy.ndarray
+        Positions for N particles in D dimensions.
+    box_size : (D,) numpy.ndarray
+        D-dimensional simulation box size.
+    bonds_3_atom1, bonds_3_atom2, bonds_3_atom3 : (M,) numpy.ndarray
+        Local index of particle 1, 2 (central), and 3 for each of :code:`M`
+        three-particle bonds.
+    bonds_3_equilibrium, bonds_3_strength : (M,) numpy.ndarray
+        Equilibrium angle and bond strength for each of :code:`M`
+        three-particle bonds.
+
+    Returns
+    -------
+    energy : float
+        Total energy of all three-particle bonds.
+
+    See also
+    --------
+    prepare_bonds :
+        Constructs the angle arrays passed to this function.
+    """
+    if not _use_numba_kernels(r):
+        if r.dtype == np.float64:
+            kernel = compute_angle_forces__fortran__double
+        else:
+            kernel = compute_angle_forces__fortran
+        return kernel(
+            f_angles, r, box_size, bonds_3_atom1, bonds_3_atom2,
+            bonds_3_atom3, bonds_3_equilibrium, bonds_3_strength,
+        )
+
+    fast_acos = os.environ.get("HYMD_FAST_ACOS", "0").lower() in (
+        "1", "true", "yes",
+    )
+    f = [np.empty(len(r), dtype=np.float64) for _ in range(3)]
+    energy = compute_angle_forces__numba(
+        *f, *(np.ascontiguousarray(r[:, d]) for d in range(3)),
+        *(float(L) for L in box_size), bonds_3_atom1, bonds_3_atom2,
+        bonds_3_atom3, bonds_3_equilibrium, bonds_3_strength, fast_acos,
+    )
+    for d in range(3):
+        f_angles[:, d] = f[d]
+    return energy
+
+
+def compute_bond_forces__plain(f_bonds, r, bonds_2, box_size):
+    """Computes forces resulting from bonded interactions
+
+    .. deprecated:: 1.0.0
+        :code:`compute_bond_forces__plain` was replaced by compiled Fortran
+        code prior to 1.0.0 release.
+
+    All bonds are handled at once with array operations, forces on particles
+    participating in several bonds are accumulated with :code:`numpy.add.at`.
+    """
+    f_bonds.fill(0.0)
+    bonds_2 = np.asarray(bonds_2, dtype=np.float64).reshape(-1, 4)
+    i = bonds_2[:, 0].astype(int)
+    j = bonds_2[:, 1].astype(int)
+    r0 = bonds_2[:, 2]
+    k = bonds_2[:, 3]
+    box_size = np.asarray(box_size)
+
+    rij = r[j, :] - r[i, :]
+
+    # Apply periodic boundary conditions to the distance rij
+    rij -= box_size * np.around(rij / box_size)
+    dr = np.linalg.norm(rij, axis=1)
+    df = -k * (dr - r0)
+    f_bond_vector = df[:, np.newaxis] * rij / dr[:, np.newaxis]
+    np.add.at(f_bonds, i, -f_bond_vector)
+    np.add.at(f_bonds, j, f_bond_vector)
+
+    return np.sum(0.5 * k * (dr - r0) ** 2)
+
+
+def compute_angle_forces__plain(f_angles, r, bonds_3, box_size):
+    """Computes forces resulting from angular interactions
+
+    .. deprecated:: 1.0.0
+        :code:`compute_angle_forces__plain` was replaced by compiled Fortran
+        code prior to 1.0.0 release.
+
+    All angles are handled at once with array operations, forces on particles
+    participating in several angles are accumulated with :code:`numpy.add.at`.
+    """
+    f_angles.fill(0.0)
+    bonds_3 = np.asarray(bonds_3, dtype=np.float64).reshape(-1, 5)
+    a = bonds_3[:, 0].astype(int)
+    b = bonds_3[:, 1].astype(int)
+    c = bonds_3[:, 2].astype(int)
+    theta0 = bonds_3[:, 3]
+    k = bonds_3[:, 4]
+    box_size = np.asarray(box_size)
+
+    ra = r[a, :] - r[b, :]
+    rc = r[c, :] - r[b, :]
+    ra -= box_size * np.around(ra / box_size)
+    rc -= box_size * np.around(rc / box_size)
+
+    xra = 1.0 / np.sqrt(np.einsum("ij,ij->i", ra, ra))
+    xrc = 1.0 / np.sqrt(np.einsum("ij,ij->i", rc, rc))
+    ea = ra * xra[:, np.newaxis]
+    ec = rc * xrc[:, np.newaxis]
+
+    cosphi = np.einsum("ij,ij->i", ea, ec)
+    theta = np.arccos(cosphi)
+    xsinph = 1.0 / np.sqrt(1.0 - cosphi ** 2)
+
+    d = theta - theta0
+    f = -k * d
+
+    xrasin = xra * xsinph * f
+    xrcsin = xrc * xsinph * f
+
+    fa = (ea * cosphi[:, np.newaxis] - ec) * xrasin[:, np.newaxis]
+    fc = (ec * cosphi[:, np.newaxis] - ea) * xrcsin[:, np.newaxis]
+
+    np.add.at(f_angles, a, fa)
+    np.add.at(f_angles, c, fc)
+    np.add.at(f_angles, b, -(fa + fc))
+
+    return np.sum(-0.5 * f * d)
+
+
 def compute_dihedral_forces__plain(f_dihedrals, r, bonds_4, box_size):
     """Computes forces resulting from dihedral interactions
 
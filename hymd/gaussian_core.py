@@ -36,22 +36,40 @@ def gaussian_core_kernel__numba(r, chi, f, box_size, sigma, kappa):
     phi0 = len(r) / V
     factor = 1 / (16 * np.pi ** (3 / 2) * kappa * sigma ** 5 * phi0)
 
-    for i, ri in enumerate(r):
+    Lx, Ly, Lz = box_size[0], box_size[1], box_size[2]
+    inv_Lx, inv_Ly, inv_Lz = 1.0 / Lx, 1.0 / Ly, 1.0 / Lz
+
+    for i in range(len(r)):
+        rix, riy, riz = r[i, 0], r[i, 1], r[i, 2]
+        fix = 0.0
+        fiy = 0.0
+        fiz = 0.0
         for j in range(i + 1, len(r)):
-            rj = r[j, :]
-            rij = rj - ri
+            dx = r[j, 0] - rix
+            dy = r[j, 1] - riy
+            dz = r[j, 2] - riz
 
             # Apply periodic boundary conditions to the distance rij
-            rij[0] -= box_size[0] * np.around(rij[0] / box_size[0])
-            rij[1] -= box_size[1] * np.around(rij[1] / box_size[1])
-            rij[2] -= box_size[2] * np.around(rij[2] / box_size[2])
+            dx -= Lx * np.rint(dx * inv_Lx)
+            dy -= Ly * np.rint(dy * inv_Ly)
+            dz -= Lz * np.rint(dz * inv_Lz)
 
-            dr2 = np.dot(rij, rij)
+            dr2 = dx * dx + dy * dy + dz * dz
             exp = np.exp(-dr2 * denominator)
 
-            f_bond_vector = rij * exp * factor * (1 + kappa * chi[i, j])
-            f[i, :] += f_bond_vector
-            f[j, :] -= f_bond_vector
+            df = exp * factor * (1 + kappa * chi[i, j])
+            fx = dx * df
+            fy = dy * df
+            fz = dz * df
+            fix += fx
+            fiy += fy
+            fiz += fz
+            f[j, 0] -= fx
+            f[j, 1] -= fy
+            f[j, 2] -= fz
+        f[i, 0] += fix
+        f[i, 1] += fiy
+        f[i, 2] += fiz
 
 
 def gaussian_core_forces(positions, force, chi, config):
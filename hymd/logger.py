@@ -7,7 +7,14 @@ from mpi4py import MPI
 
 class MPIFilterRoot(logging.Filter):
     """Log output Filter wrapper class for the root MPI rank log
+
+    The MPI rank and size are looked up once when the filter is created.
     """
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.rank = MPI.COMM_WORLD.Get_rank()
+        self.size = MPI.COMM_WORLD.Get_size()
+
     def filter(self, record):
         """Log event message filter
 
@@ -18,9 +25,9 @@ class MPIFilterRoot(logging.Filter):
         """
         if record.funcName == "<module>":
             record.funcName = "main"
-        if MPI.COMM_WORLD.Get_rank() == 0:
-            record.rank = MPI.COMM_WORLD.Get_rank()
-            record.size = MPI.COMM_WORLD.Get_size()
+        if self.rank == 0:
+            record.rank = self.rank
+            record.size = self.size
             return True
         else:
             return False
@@ -28,7 +35,14 @@ class MPIFilterRoot(logging.Filter):
 
 class MPIFilterAll(logging.Filter):
     """Log output Filter wrapper class for the all-MPI-ranks log
+
+    The MPI rank and size are looked up once when the filter is created.
     """
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.rank = MPI.COMM_WORLD.Get_rank()
+        self.size = MPI.COMM_WORLD.Get_size()
+
     def filter(self, record):
         """Log event message filter
 
@@ -39,8 +53,8 @@ class MPIFilterAll(logging.Filter):
         """
         if record.funcName == "<module>":
             record.funcName = "main"
-        record.rank = MPI.COMM_WORLD.Get_rank()
-        record.size = MPI.COMM_WORLD.Get_size()
+        record.rank = self.rank
+        record.size = self.size
         return True
 
 
@@ -17,7 +17,8 @@ from .field import (compute_field_force, update_field,
                     update_field_force_q, compute_field_energy_q,)
 from .thermostat import (csvr_thermostat, cancel_com_momentum,
                          generate_initial_velocities)
-from .force import dipole_forces_redistribution, prepare_bonds
+from .force import (dipole_forces_redistribution, prepare_bonds,
+                    compute_bond_forces, compute_angle_forces)
 from .integrator import integrate_velocity, integrate_position
 
 
@@ -38,23 +39,11 @@ def main():
 
     if args.double_precision:
         dtype = np.float64
-        from .force import (
-            compute_bond_forces__fortran__double as compute_bond_forces
-        )
-        from .force import (
-            compute_angle_forces__fortran__double as compute_angle_forces
-        )
         from .force import (
             compute_dihedral_forces__fortran__double as compute_dihedral_forces
         )
     else:
         dtype = np.float32
-        from .force import (
-            compute_bond_forces__fortran as compute_bond_forces
-        )
-        from .force import (
-            compute_angle_forces__fortran as compute_angle_forces
-        )
         from .force import (
             compute_dihedral_forces__fortran as compute_dihedral_forces
         )
@@ -46,6 +46,65 @@ def generate_initial_velocities(velocities, config, comm=MPI.COMM_WORLD):
     return velocities
 
 
+class RandomBatches:
+    """Batched random number generation for the thermostat
+
+    Random numbers are drawn from a :code:`numpy.random.Generator` in batches
+    of :code:`batch_size` and handed out one at a time, avoiding the overhead
+    of a separate generator call for every sample. Separate batches are kept
+    for each number of degrees of freedom of the :math:`\\chi^2` samples.
+
+    Attributes
+    ----------
+    batch_size : int
+        Number of random numbers drawn at once.
+    rng : numpy.random.Generator
+        Random number generator used for all draws.
+    """
+    batch_size = 1024
+    rng = np.random.default_rng()
+    _batches = {}
+
+    @classmethod
+    def seed(cls, seed=None):
+        """Reseed the random number generator and discard drawn batches
+
+        Parameters
+        ----------
+        seed : int, optional
+            Seed passed to :code:`numpy.random.default_rng`. If None, fresh
+            entropy is used.
+        """
+        cls.rng = np.random.default_rng(seed)
+        cls._batches = {}
+
+    @classmethod
+    def draw(cls, key, sample):
+        """Return the next number from the batch identified by :code:`key`
+
+        Parameters
+        ----------
+        key : hashable
+            Identifies the distribution of the batch.
+        sample : callable
+            Called as :code:`sample(rng, size)` to draw a new batch when the
+            current one is exhausted.
+
+        Returns
+        -------
+        float
+            The next number of the batch.
+        """
+        batch, position = cls._batches.get(key, (None, cls.batch_size))
+        if position == cls.batch_size:
+            batch, position = sample(cls.rng, cls.batch_size), 0
+        cls._batches[key] = (batch, position + 1)
+        return float(batch[position])
+
+
+WILSON_HILFERTY_THRESHOLD = 50
+
+
 def _random_gaussian() -> float:
     """Draw a single random number from the standard normal distribution
     Generate a number from the Gaussian distribution centered at zero with unit
@@ -55,15 +114,24 @@ def _random_gaussian() -> float:
     -------
     float
         A random number drawn from :math:`N(0, 1)`.
+
+    See Also
+    --------
+    RandomBatches :
+        Batched generation of the random numbers.
     """
-    return np.random.normal()
+    return RandomBatches.draw(
+        "gaussian", lambda rng, size: rng.standard_normal(size)
+    )
 
 
 def _random_chi_squared(M: int) -> float:
     """Draw the sum of :code:`M` squared normally distributed values
 
     The value is generated by the Gamma distribution, in lieu of generating
-    :code:`M` Gaussian distributed numbers and summing their squares.
+    :code:`M` Gaussian distributed numbers and summing their squares. For
+    :code:`M` larger than :code:`WILSON_HILFERTY_THRESHOLD`, the
+    Wilson-Hilferty normal approximation is used instead.
 
     Parameters
     ----------
@@ -94,13 +162,31 @@ def _random_chi_squared(M: int) -> float:
 
         \\chi^2(k) \\sim 2 \\Gamma(k/2, 2)
 
+    For large :math:`k`, the cube root of :math:`\\chi^2(k)/k` is very nearly
+    normally distributed, such that
+
+    .. math::
+
+        \\chi^2(k) \\approx k\\left(1 - \\frac{2}{9k}
+        + Z\\sqrt{\\frac{2}{9k}}\\right)^3,
+
+    with :math:`Z\\sim N(0, 1)`, at the cost of a single Gaussian draw.
+
     References
     ----------
     Knuth, D.E. 1981, Seminumerical Algorithms, 2nd ed., vol. 2 of The Art of
     Computer Programming (Reading, MA: Addison-Wesley), pp. 120ff.
     J. H. Ahrens and U. Dieter, Computing 12 (1974), 223-246.
+    E. B. Wilson and M. M. Hilferty, Proc. Natl. Acad. Sci. 17, 684-688
+    (1931).
     """
-    return np.random.chisquare(M)
+    if M > WILSON_HILFERTY_THRESHOLD:
+        a = 2.0 / (9.0 * M)
+        t = 1.0 - a + _random_gaussian() * np.sqrt(a)
+        return M * t * t * t
+    return RandomBatches.draw(
+        ("chi_squared", M), lambda rng, size: rng.chisquare(M, size)
+    )
 
 
 def csvr_thermostat(
@@ -165,20 +251,43 @@ def csvr_thermostat(
     """
     if not any(config.thermostat_coupling_groups):
         config.thermostat_coupling_groups = [config.unique_names.copy()]
+
+    # Encode the particle names as integer indices into the (sorted) unique
+    # names once, so that each group selection is a single integer lookup
+    unique_names = np.array(config.unique_names, dtype=np.bytes_)
+    type_id = np.searchsorted(unique_names, names)
+    name_to_id = {n: t for t, n in enumerate(config.unique_names)}
+
     for i, group in enumerate(config.thermostat_coupling_groups):
-        ind = np.where(
-            np.logical_or.reduce(list(names == np.string_(t) for t in group))
+        group_ids = np.array(
+            [name_to_id[t] for t in group if t in name_to_id], dtype=int
         )
-        group_n_particles = comm.allreduce(len(ind[0]), MPI.SUM)
+        ind = np.nonzero(np.isin(type_id, group_ids))
+
+        # Reduce the particle count, velocity sum, and squared velocity sums
+        # of the group (and of all particles) in a single communication
+        group_velocity = velocity[ind]
+        local_sums = np.empty(6, dtype=np.float64)
+        local_sums[0] = len(ind[0])
+        local_sums[1:4] = np.sum(group_velocity, axis=0)
+        local_sums[4] = np.einsum("ij,ij->", group_velocity, group_velocity)
+        local_sums[5] = np.einsum("ij,ij->", velocity, velocity)
+        global_sums = np.empty_like(local_sums)
+        comm.Allreduce(local_sums, global_sums, op=MPI.SUM)
+        group_n_particles = int(round(global_sums[0]))
 
-        # Clean velocities of center of mass momentum
+        # Clean velocities of center of mass momentum. The kinetic energy of
+        # the cleaned velocities follows from the reduced sums as
+        # sum_i |v_i - V/n|^2 = sum_i |v_i|^2 - |V|^2 / n
         if remove_center_of_mass_momentum and group_n_particles > 1:
-            com_velocity = comm.allreduce(np.sum(velocity[ind], axis=0))
-            velocity_clean = velocity[ind] - com_velocity / group_n_particles
-            K = comm.allreduce(0.5 * config.mass
-                               * np.sum(velocity_clean[...]**2))
+            com_velocity = global_sums[1:4]
+            velocity_clean = group_velocity - com_velocity / group_n_particles
+            K = 0.5 * config.mass * (
+                global_sums[4]
+                - np.dot(com_velocity, com_velocity) / group_n_particles
+            )
         else:
-            K = comm.allreduce(0.5 * config.mass * np.sum(velocity[...]**2))
+            K = 0.5 * config.mass * global_sums[5]
         K_target = (
             1.5 * config.gas_constant * group_n_particles
             * config.target_temperature
@@ -188,12 +297,12 @@ def csvr_thermostat(
 
         # Draw random numbers and broadcast them so they are identical across
         # MPI ranks
-        R = SNf = None
+        random_numbers = np.empty(2, dtype=np.float64)
         if comm.Get_rank() == 0:
-            R = random_gaussian()
-            SNf = random_chi_squared(N_f - 1)
-        R = comm.bcast(R, root=0)
-        SNf = comm.bcast(SNf, root=0)
+            random_numbers[0] = random_gaussian()
+            random_numbers[1] = random_chi_squared(N_f - 1)
+        comm.Bcast(random_numbers, root=0)
+        R, SNf = random_numbers
 
         alpha2 = (
             c + (1 - c) * (SNf + R**2) * K_target / (N_f * K)
@@ -26,7 +26,10 @@ force_kernels = Extension(
         "hymd/compute_dihedral_forces__double.f90",
         "hymd/dipole_reconstruction.f90",
         "hymd/dipole_reconstruction__double.f90",
-    ]
+    ],
+    extra_f90_compile_args=[
+        "-O3", "-ffast-math", "-march=native", "-funroll-loops",
+    ],
 )
 
 setup(
@@ -51,7 +54,7 @@ setup(
         "h5py",
         "mpi4py",
         "mpsort",
-        "networkx",
+        "numba",
         "numpy",
         "pfft-python",
         "pmesh",
@@ -3,7 +3,7 @@ import sympy
 import numpy as np
 import h5py
 import pytest
-import collections
+from hymd.force import Bond, Angle, Dihedral
 
 
 @pytest.fixture
@@ -74,22 +74,24 @@ def dppc_single():
     names = np.array([b'N', b'P', b'G', b'G', b'C', b'C', b'C', b'C', b'C',
                       b'C', b'C', b'C'], dtype='S5')
     CONF = {}
-    Bond = collections.namedtuple(
-        'Bond', ['atom_1', 'atom_2', 'equilibrium', 'strength']
+    CONF['bond_2'] = (
+        Bond(atom_1='N', atom_2='P', equilibrium=0.47, strength=1250.0),
+        Bond(atom_1='P', atom_2='G', equilibrium=0.47, strength=1250.0),
+        Bond(atom_1='G', atom_2='G', equilibrium=0.37, strength=1250.0),
+        Bond(atom_1='G', atom_2='C', equilibrium=0.47, strength=1250.0),
+        Bond(atom_1='C', atom_2='C', equilibrium=0.47, strength=1250.0),
     )
-    Angle = collections.namedtuple(
-        'Angle', ['atom_1', 'atom_2', 'atom_3', 'equilibrium', 'strength']
+
+    CONF['bond_3'] = (
+        Angle(atom_1='P', atom_2='G', atom_3='G', equilibrium=120.0,
+              strength=25.0),
+        Angle(atom_1='P', atom_2='G', atom_3='C', equilibrium=180.0,
+              strength=25.0),
+        Angle(atom_1='G', atom_2='C', atom_3='C', equilibrium=180.0,
+              strength=25.0),
+        Angle(atom_1='C', atom_2='C', atom_3='C', equilibrium=180.0,
+              strength=25.0),
     )
-    CONF['bond_2'] = (Bond('N', 'P', 0.47, 1250.0),
-                      Bond('P', 'G', 0.47, 1250.0),
-                      Bond('G', 'G', 0.37, 1250.0),
-                      Bond('G', 'C', 0.47, 1250.0),
-                      Bond('C', 'C', 0.47, 1250.0))
-
-    CONF['bond_3'] = (Angle('P', 'G', 'G', 120.0, 25.0),
-                      Angle('P', 'G', 'C', 180.0, 25.0),
-                      Angle('G', 'C', 'C', 180.0, 25.0),
-                      Angle('C', 'C', 'C', 180.0, 25.0))
     for k, v in {'Np': 12, 'types': 5, 'mass': 72.0,
                  'L': [13.0, 13.0, 14.0]}.items():
         CONF[k] = v
@@ -161,35 +163,27 @@ def alanine_octapeptide():
         dtype="S5"
     )
     CONF = {}
-    Bond = collections.namedtuple(
-        "Bond", ["atom_1", "atom_2", "equilibrium", "strength"]
-    )
-    Angle = collections.namedtuple(
-        "Angle", ["atom_1", "atom_2", "atom_3", "equilibrium", "strength"]
-    )
-    Dihedral = collections.namedtuple(
-        "Dihedral",
-        ["atom_1", "atom_2", "atom_3", "atom_4", "coeffs", "dih_type"]
-    )
     # Values for bonds and angles taken from MARTINI 3 parameters.
     # Not used to test dihedral forces.
     CONF["bond_2"] = (
-        Bond("BB", "SC", 0.27, 100000),
-        Bond("BB", "BB", 0.35, 4000),
+        Bond(atom_1="BB", atom_2="SC", equilibrium=0.27, strength=100000),
+        Bond(atom_1="BB", atom_2="BB", equilibrium=0.35, strength=4000),
     )
     CONF["bond_3"] = (
-        Angle("BB", "BB", "BB", 127, 20),
-        Angle("BB", "BB", "SC", 100, 25),
+        Angle(atom_1="BB", atom_2="BB", atom_3="BB", equilibrium=127,
+              strength=20),
+        Angle(atom_1="BB", atom_2="BB", atom_3="SC", equilibrium=100,
+              strength=25),
     )
     # Symbolic arrays of 1s and 0s for analytical check
     CONF["bond_4"] = (
         Dihedral(
-            "BB", "BB", "BB", "BB",
-            np.array([
+            atom_1="BB", atom_2="BB", atom_3="BB", atom_4="BB",
+            coeffs=np.array([
                 [1, 1, 1, 1, 1],
                 [0, 0, 0, 0, 0]
             ]),
-            0,
+            dih_type=0,
         ),
     )
     for k, v in {
@@ -1,5 +1,7 @@
+import dataclasses
 import pytest
 import numpy as np
+import numba
 from hymd.input_parser import Config
 from hymd.force import (
     compute_bond_forces__plain as compute_bond_forces
@@ -13,6 +15,15 @@ from hymd.force import (
 from hymd.force import (
     prepare_bonds_old as prepare_bonds
 )
+from hymd.force import (
+    compute_bond_forces__numba, compute_angle_forces__numba,
+    find_bonds_and_angles, _acos_poly, Bond, Angle, ThreadForceBuffers,
+)
+from hymd.force import prepare_bonds as prepare_bonds__arrays
+from hymd.force import (
+    compute_bond_forces as compute_bond_forces__dispatch,
+    compute_angle_forces as compute_angle_forces__dispatch,
+)
 
 
 def test_prepare_bonds_2(dppc_single):
@@ -91,7 +102,10 @@ def test_comp_bonds(dppc_single):
         [-5.5323489341501677,  -5.4217094311092637,  -4.4175438063815795]],
         dtype=np.float64
     )
-    for i, b in enumerate(bonds_2):
+    expected_bonds = [(0, 1), (1, 2), (2, 3), (2, 4), (3, 8), (4, 5),
+                      (8, 9), (5, 6), (6, 7), (9, 10), (10, 11)]
+    for b in bonds_2:
+        i = expected_bonds.index(tuple(b[:2]))
         f_bonds = np.zeros(shape=r.shape, dtype=np.float64)
         energy = 0.0
         energy = compute_bond_forces(f_bonds, r, (b,), CONF['L'])
@@ -127,6 +141,94 @@ def test_prepare_bonds_3(dppc_single):
                 assert e[4] == pytest.approx(val[1], abs=1e-13)
 
 
+def test_find_bonds_and_angles(dppc_single):
+    indices, bonds, names, molecules, r, CONF = dppc_single
+    config = Config(n_steps=1, time_step=0.03, mesh_size=[30, 30, 30],
+                    box_size=np.array([13.0, 13.0, 14.0]), sigma=0.5, kappa=1)
+    config.bonds = CONF['bond_2']
+    config.angle_bonds = CONF['bond_3']
+    bonds_2, bonds_3, _, _ = prepare_bonds(
+        molecules, names, bonds, indices, config
+    )
+
+    # Keep each bond listed only on the lower index particle, and shuffle the
+    # global indices, which should not change the bonds found.
+    bonds_one_sided = np.where(
+        bonds > np.arange(len(bonds))[:, np.newaxis], bonds, -1
+    )
+    permutation = np.random.default_rng(1).permutation(len(indices))
+    shuffled_indices = indices[permutation]
+    shuffled_bonds = np.where(
+        bonds_one_sided != -1, permutation[bonds_one_sided], -1
+    )
+    (
+        bonds_2_atom1, bonds_2_atom2, bonds_2_equilibrium, bonds_2_strength,
+        bonds_3_atom1, bonds_3_atom2, bonds_3_atom3, bonds_3_equilibrium,
+        bonds_3_strength,
+    ) = find_bonds_and_angles(
+        molecules, names, shuffled_bonds, shuffled_indices, config
+    )
+    assert len(bonds_2_atom1) == len(bonds_2)
+    assert len(bonds_3_atom1) == len(bonds_3)
+    # Bonds are oriented by global index, so either direction may be found
+    for b in bonds_2:
+        ind = np.where(
+            ((bonds_2_atom1 == b[0]) & (bonds_2_atom2 == b[1]))
+            | ((bonds_2_atom1 == b[1]) & (bonds_2_atom2 == b[0]))
+        )[0]
+        assert len(ind) == 1
+        assert bonds_2_equilibrium[ind[0]] == pytest.approx(b[2], abs=1e-13)
+        assert bonds_2_strength[ind[0]] == pytest.approx(b[3], abs=1e-13)
+    for b in bonds_3:
+        ind = np.where(
+            (bonds_3_atom2 == b[1]) & (
+                ((bonds_3_atom1 == b[0]) & (bonds_3_atom3 == b[2]))
+                | ((bonds_3_atom1 == b[2]) & (bonds_3_atom3 == b[0]))
+            )
+        )[0]
+        assert len(ind) == 1
+        assert bonds_3_equilibrium[ind[0]] == pytest.approx(b[3], abs=1e-13)
+        assert bonds_3_strength[ind[0]] == pytest.approx(b[4], abs=1e-13)
+
+
+@pytest.mark.parametrize("ring_size", [3, 4, 5])
+def test_find_bonds_and_angles_ring(ring_size):
+    indices = np.arange(ring_size)
+    molecules = np.zeros(ring_size, dtype=int)
+    names = np.array([b'A'] * ring_size, dtype='S5')
+    bonds = -np.ones((ring_size, 2), dtype=int)
+    bonds[:, 0] = (indices + 1) % ring_size
+    config = Config(n_steps=1, time_step=0.03, mesh_size=[30, 30, 30],
+                    box_size=np.array([13.0, 13.0, 14.0]), sigma=0.5, kappa=1)
+    config.bonds = [
+        Bond(atom_1='A', atom_2='A', equilibrium=0.47, strength=1250.0)
+    ]
+    config.angle_bonds = [
+        Angle(atom_1='A', atom_2='A', atom_3='A', equilibrium=120.0,
+              strength=25.0)
+    ]
+    (
+        bonds_2_atom1, bonds_2_atom2, _, _,
+        bonds_3_atom1, bonds_3_atom2, bonds_3_atom3, _, _,
+    ) = find_bonds_and_angles(molecules, names, bonds, indices, config)
+
+    # Angles are only made along shortest paths between particles which are
+    # not directly bonded, once per pair of end particles
+    expected_angles = {
+        3: [],
+        4: [(0, 1, 2), (1, 0, 3)],
+        5: [(0, 1, 2), (0, 4, 3), (1, 0, 4), (1, 2, 3), (2, 3, 4)],
+    }[ring_size]
+    assert len(bonds_2_atom1) == ring_size
+    assert sorted(zip(bonds_2_atom1, bonds_2_atom2)) == sorted(
+        (min(i, j), max(i, j))
+        for i, j in zip(indices, (indices + 1) % ring_size)
+    )
+    assert sorted(
+        zip(bonds_3_atom1, bonds_3_atom2, bonds_3_atom3)
+    ) == expected_angles
+
+
 def test_comp_angles(dppc_single):
     indices, bonds, names, molecules, r, CONF = dppc_single
     config = Config(n_steps=1, time_step=0.03, mesh_size=[30, 30, 30],
@@ -176,7 +278,10 @@ def test_comp_angles(dppc_single):
         dtype=np.float64
     )
 
-    for i, b in enumerate(bonds_3):
+    expected_angles = [(1, 2, 3), (1, 2, 4), (2, 4, 5), (3, 8, 9), (4, 5, 6),
+                       (8, 9, 10), (5, 6, 7), (9, 10, 11)]
+    for b in bonds_3:
+        i = expected_angles.index(tuple(b[:3]))
         f_angles = np.zeros(shape=r.shape, dtype=np.float64)
         energy = 0.0
         energy = compute_angle_forces(f_angles, r, (b,), CONF['L'])
@@ -186,6 +291,249 @@ def test_comp_angles(dppc_single):
         assert f_angles[b[2], :] == pytest.approx(expected_forces_k[i], abs=1e-13)  # noqa: E501
 
 
+@pytest.mark.parametrize("n_threads", [1, 3])
+def test_comp_bonds_and_angles_numba(dppc_single, n_threads):
+    if n_threads > numba.config.NUMBA_NUM_THREADS:
+        pytest.skip(f"numba is limited to {numba.config.NUMBA_NUM_THREADS} "
+                    "threads")
+    numba.set_num_threads(n_threads)
+    try:
+        _check_bonds_and_angles_numba(dppc_single)
+    finally:
+        numba.set_num_threads(numba.config.NUMBA_NUM_THREADS)
+
+
+def _check_bonds_and_angles_numba(dppc_single):
+    indices, bonds, names, molecules, r, CONF = dppc_single
+    config = Config(n_steps=1, time_step=0.03, mesh_size=[30, 30, 30],
+                    box_size=np.array([13.0, 13.0, 14.0]), sigma=0.5, kappa=1)
+    config.bonds = CONF['bond_2']
+    config.angle_bonds = CONF['bond_3']
+    bonds_2, bonds_3, _, _ = prepare_bonds(
+        molecules, names, bonds, indices, config
+    )
+    (
+        bonds_2_atom1, bonds_2_atom2, bonds_2_equilibrium, bonds_2_strength,
+        bonds_3_atom1, bonds_3_atom2, bonds_3_atom3, bonds_3_equilibrium,
+        bonds_3_strength,
+    ) = find_bonds_and_angles(molecules, names, bonds, indices, config)
+    rx, ry, rz = (np.ascontiguousarray(r[:, d]) for d in range(3))
+    Lx, Ly, Lz = CONF['L']
+
+    # Stale contents of the reused per-thread buffers must not leak into the
+    # forces.
+    ThreadForceBuffers.get(4, len(r), np.float64)[:] = np.nan
+
+    f_bonds = np.zeros(shape=r.shape, dtype=np.float64)
+    expected_energy = compute_bond_forces(f_bonds, r, bonds_2, CONF['L'])
+    f = [np.zeros(len(r), dtype=np.float64) for _ in range(3)]
+    energy = compute_bond_forces__numba(
+        *f, rx, ry, rz, Lx, Ly, Lz, bonds_2_atom1, bonds_2_atom2,
+        bonds_2_equilibrium, bonds_2_strength,
+    )
+    assert energy == pytest.approx(expected_energy, abs=1e-12)
+    assert np.stack(f, axis=1) == pytest.approx(f_bonds, abs=1e-12)
+
+    f_angles = np.zeros(shape=r.shape, dtype=np.float64)
+    expected_energy = compute_angle_forces(f_angles, r, bonds_3, CONF['L'])
+    f = [np.zeros(len(r), dtype=np.float64) for _ in range(3)]
+    energy = compute_angle_forces__numba(
+        *f, rx, ry, rz, Lx, Ly, Lz, bonds_3_atom1, bonds_3_atom2,
+        bonds_3_atom3, bonds_3_equilibrium, bonds_3_strength,
+    )
+    assert energy == pytest.approx(expected_energy, abs=1e-12)
+    assert np.stack(f, axis=1) == pytest.approx(f_angles, abs=1e-12)
+
+    # Translating particles by whole box lengths must not change anything.
+    shift = np.random.default_rng(2).integers(-2, 3, size=r.shape)
+    r_shifted = r + shift * np.asarray(CONF['L'])
+    rx, ry, rz = (np.ascontiguousarray(r_shifted[:, d]) for d in range(3))
+    energy = compute_bond_forces__numba(
+        *f, rx, ry, rz, Lx, Ly, Lz, bonds_2_atom1, bonds_2_atom2,
+        bonds_2_equilibrium, bonds_2_strength,
+    )
+    assert energy == pytest.approx(
+        compute_bond_forces(f_bonds, r, bonds_2, CONF['L']), abs=1e-10
+    )
+    assert np.stack(f, axis=1) == pytest.approx(f_bonds, abs=1e-10)
+    energy = compute_angle_forces__numba(
+        *f, rx, ry, rz, Lx, Ly, Lz, bonds_3_atom1, bonds_3_atom2,
+        bonds_3_atom3, bonds_3_equilibrium, bonds_3_strength,
+    )
+    assert energy == pytest.approx(expected_energy, abs=1e-10)
+    assert np.stack(f, axis=1) == pytest.approx(f_angles, abs=1e-10)
+
+
+def test_comp_bonds_and_angles_numba_mixed_precision(dppc_single):
+    indices, bonds, names, molecules, r, CONF = dppc_single
+    config = Config(n_steps=1, time_step=0.03, mesh_size=[30, 30, 30],
+                    box_size=np.array([13.0, 13.0, 14.0]), sigma=0.5, kappa=1)
+    config.bonds = CONF['bond_2']
+    config.angle_bonds = CONF['bond_3']
+    bonds_2, bonds_3, _, _ = prepare_bonds(
+        molecules, names, bonds, indices, config
+    )
+    arrays = find_bonds_and_angles(molecules, names, bonds, indices, config)
+
+    # Single precision positions are used as-is, with double precision
+    # arithmetic and force accumulation
+    r_single = r.astype(np.float32)
+    r_rounded = r_single.astype(np.float64)
+    rx, ry, rz = (np.ascontiguousarray(r_single[:, d]) for d in range(3))
+
+    f_bonds = np.zeros(shape=r.shape, dtype=np.float64)
+    expected_energy = compute_bond_forces(
+        f_bonds, r_rounded, bonds_2, CONF['L']
+    )
+    f = [np.zeros(len(r), dtype=np.float64) for _ in range(3)]
+    energy = compute_bond_forces__numba(
+        *f, rx, ry, rz, *CONF['L'], *arrays[:4],
+    )
+    assert energy == pytest.approx(expected_energy, abs=1e-12)
+    assert np.stack(f, axis=1) == pytest.approx(f_bonds, abs=1e-12)
+
+    f_angles = np.zeros(shape=r.shape, dtype=np.float64)
+    expected_energy = compute_angle_forces(
+        f_angles, r_rounded, bonds_3, CONF['L']
+    )
+    energy = compute_angle_forces__numba(
+        *f, rx, ry, rz, *CONF['L'], *arrays[4:],
+    )
+    assert energy == pytest.approx(expected_energy, abs=1e-12)
+    assert np.stack(f, axis=1) == pytest.approx(f_angles, abs=1e-12)
+
+
+def test_comp_bonds_and_angles_numba_mixed_precision_boundary():
+    # A bond and an angle crossing the periodic boundary, where forming the
+    # distance vectors in single precision would lose accuracy
+    L = np.array([13.0, 13.0, 14.0])
+    r_single = np.array([
+        [12.91, 5.17, 0.43],
+        [0.30, 5.93, 13.71],
+        [1.13, 6.82, 0.38],
+    ], dtype=np.float32)
+    r_rounded = r_single.astype(np.float64)
+    rx, ry, rz = (np.ascontiguousarray(r_single[:, d]) for d in range(3))
+
+    bonds_2 = [[0, 1, 0.47, 1250.0], [1, 2, 0.47, 1250.0]]
+    bonds_3 = [[0, 1, 2, np.radians(120.0), 25.0]]
+    a1, a2 = (np.array([b[d] for b in bonds_2]) for d in range(2))
+    r0, k = (np.array([b[d] for b in bonds_2]) for d in range(2, 4))
+    b1, b2, b3 = (np.array([b[d] for b in bonds_3]) for d in range(3))
+    theta0, k_theta = (np.array([b[d] for b in bonds_3]) for d in range(3, 5))
+
+    f_bonds = np.zeros(shape=r_rounded.shape, dtype=np.float64)
+    expected_energy = compute_bond_forces(f_bonds, r_rounded, bonds_2, L)
+    f = [np.zeros(len(r_rounded), dtype=np.float64) for _ in range(3)]
+    energy = compute_bond_forces__numba(*f, rx, ry, rz, *L, a1, a2, r0, k)
+    assert energy == pytest.approx(expected_energy, abs=1e-12)
+    assert np.stack(f, axis=1) == pytest.approx(f_bonds, abs=1e-12)
+
+    f_angles = np.zeros(shape=r_rounded.shape, dtype=np.float64)
+    expected_energy = compute_angle_forces(f_angles, r_rounded, bonds_3, L)
+    energy = compute_angle_forces__numba(
+        *f, rx, ry, rz, *L, b1, b2, b3, theta0, k_theta,
+    )
+    assert energy == pytest.approx(expected_energy, abs=1e-12)
+    assert np.stack(f, axis=1) == pytest.approx(f_angles, abs=1e-12)
+
+
+def test_acos_poly():
+    for x in np.linspace(-1.0, 1.0, 10001):
+        assert _acos_poly(x) == pytest.approx(np.arccos(x), abs=3e-8)
+
+
+def test_comp_angles_numba_fast_acos(dppc_single):
+    indices, bonds, names, molecules, r, CONF = dppc_single
+    config = Config(n_steps=1, time_step=0.03, mesh_size=[30, 30, 30],
+                    box_size=np.array([13.0, 13.0, 14.0]), sigma=0.5, kappa=1)
+    config.angle_bonds = CONF['bond_3']
+    _, bonds_3, _, _ = prepare_bonds(molecules, names, bonds, indices, config)
+    (
+        _, _, _, _, bonds_3_atom1, bonds_3_atom2, bonds_3_atom3,
+        bonds_3_equilibrium, bonds_3_strength,
+    ) = find_bonds_and_angles(molecules, names, bonds, indices, config)
+    rx, ry, rz = (np.ascontiguousarray(r[:, d]) for d in range(3))
+
+    f_angles = np.zeros(shape=r.shape, dtype=np.float64)
+    expected_energy = compute_angle_forces(f_angles, r, bonds_3, CONF['L'])
+    f = [np.zeros(len(r), dtype=np.float64) for _ in range(3)]
+    energy = compute_angle_forces__numba(
+        *f, rx, ry, rz, *CONF['L'], bonds_3_atom1, bonds_3_atom2,
+        bonds_3_atom3, bonds_3_equilibrium, bonds_3_strength, True,
+    )
+    assert energy == pytest.approx(expected_energy, abs=1e-5)
+    assert np.stack(f, axis=1) == pytest.approx(f_angles, abs=1e-5)
+
+
+@pytest.mark.parametrize("backend", ["fortran", "numba"])
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_comp_bonds_and_angles_dispatch(dppc_single, monkeypatch, backend,
+                                        dtype):
+    monkeypatch.setenv("HYMD_FORCE_BACKEND", backend)
+    indices, bonds, names, molecules, r, CONF = dppc_single
+    config = Config(n_steps=1, time_step=0.03, mesh_size=[30, 30, 30],
+                    box_size=np.array([13.0, 13.0, 14.0]), sigma=0.5, kappa=1)
+    config.bonds = CONF['bond_2']
+    config.angle_bonds = CONF['bond_3']
+    bonds_2, bonds_3, _, _ = prepare_bonds(
+        molecules, names, bonds, indices, config
+    )
+    (
+        bonds_2_atom1, bonds_2_atom2, bonds_2_equilibrium, bonds_2_strength,
+        bonds_3_atom1, bonds_3_atom2, bonds_3_atom3, bonds_3_equilibrium,
+        bonds_3_strength,
+    ) = find_bonds_and_angles(molecules, names, bonds, indices, config)
+    tol = 1e-12 if dtype == np.float64 else 1e-3
+    positions = np.asfortranarray(r.astype(dtype))
+
+    f_expected = np.zeros(shape=r.shape, dtype=np.float64)
+    expected_energy = compute_bond_forces(f_expected, r, bonds_2, CONF['L'])
+    f = np.asfortranarray(np.zeros(shape=r.shape, dtype=dtype))
+    energy = compute_bond_forces__dispatch(
+        f, positions, config.box_size, bonds_2_atom1, bonds_2_atom2,
+        bonds_2_equilibrium, bonds_2_strength,
+    )
+    assert energy == pytest.approx(expected_energy, rel=tol, abs=tol)
+    assert f == pytest.approx(f_expected, rel=tol, abs=tol)
+
+    f_expected = np.zeros(shape=r.shape, dtype=np.float64)
+    expected_energy = compute_angle_forces(f_expected, r, bonds_3, CONF['L'])
+    f = np.asfortranarray(np.zeros(shape=r.shape, dtype=dtype))
+    energy = compute_angle_forces__dispatch(
+        f, positions, config.box_size, bonds_3_atom1, bonds_3_atom2,
+        bonds_3_atom3, bonds_3_equilibrium, bonds_3_strength,
+    )
+    assert energy == pytest.approx(expected_energy, rel=tol, abs=tol)
+    assert f == pytest.approx(f_expected, rel=tol, abs=tol)
+
+
+def test_prepare_bonds_empty(dppc_single, alanine_octapeptide):
+    # A rank may not hold any particles after the domain decomposition
+    CONF = dppc_single[-1]
+    config = Config(n_steps=1, time_step=0.03, mesh_size=[30, 30, 30],
+                    box_size=np.array([13.0, 13.0, 14.0]), sigma=0.5, kappa=1)
+    config.bonds = CONF['bond_2']
+    config.angle_bonds = CONF['bond_3']
+    config.dihedrals = alanine_octapeptide[-1]['bond_4']
+    args = (
+        np.empty(0, dtype=int), np.empty(0, dtype='S5'),
+        np.empty((0, 3), dtype=int), np.empty(0, dtype=int), config,
+    )
+    assert prepare_bonds(*args) == ([], [], [], [])
+    arrays = prepare_bonds__arrays(*args)
+    assert all(a.shape[0] == 0 for a in arrays)
+
+    r = np.empty((0, 3), dtype=np.float64)
+    f = np.zeros_like(r)
+    assert compute_bond_forces__dispatch(
+        f, r, config.box_size, *arrays[:4]
+    ) == 0.0
+    assert compute_angle_forces__dispatch(
+        f, r, config.box_size, *arrays[4:9]
+    ) == 0.0
+
+
 def test_prepare_bonds_4(alanine_octapeptide):
     indices, bonds, names, molecules, r, CONF = alanine_octapeptide
     config = Config(n_steps=1, time_step=0.03, mesh_size=[30, 30, 30],
@@ -212,6 +560,43 @@ def test_prepare_bonds_4(alanine_octapeptide):
                 assert e[5] == pytest.approx(val[1], abs=1e-13)
 
 
+def test_prepare_bonds_4_interleaved_molecules(alanine_octapeptide):
+    # Two copies of the peptide with their particles interleaved, and the
+    # second copy labeled as the first molecule
+    indices, bonds, names, molecules, r, CONF = alanine_octapeptide
+    config = Config(n_steps=1, time_step=0.03, mesh_size=[30, 30, 30],
+                    box_size=np.array([5.0, 5.0, 5.0]), sigma=0.5, kappa=1)
+    config.dihedrals = [
+        dataclasses.replace(d, dih_type=1) for d in CONF['bond_4']
+    ]
+    _, _, bonds_4, bb_index = prepare_bonds(
+        molecules, names, bonds, indices, config
+    )
+    assert bb_index
+
+    n = len(indices)
+    shift = np.max(indices) + 1
+    indices_2 = np.empty(2 * n, dtype=indices.dtype)
+    indices_2[0::2] = indices
+    indices_2[1::2] = indices + shift
+    bonds_2 = np.empty((2 * n, bonds.shape[1]), dtype=bonds.dtype)
+    bonds_2[0::2] = bonds
+    bonds_2[1::2] = np.where(bonds == -1, -1, bonds + shift)
+    names_2 = np.repeat(names, 2)
+    molecules_2 = np.tile([1, 0], n)
+    _, _, bonds_4_2, bb_index_2 = prepare_bonds(
+        molecules_2, names_2, bonds_2, indices_2, config
+    )
+
+    expected = (
+        [[2 * i + 1 for i in b[:4]] for b in bonds_4]
+        + [[2 * i for i in b[:4]] for b in bonds_4]
+    )
+    assert [b[:4] for b in bonds_4_2] == expected
+    assert [b[5] for b in bonds_4_2] == 2 * [b[5] for b in bonds_4]
+    assert bb_index_2 == bb_index + [i + len(bonds_4) for i in bb_index]
+
+
 def test_comp_dihedrals(alanine_octapeptide):
     indices, bonds, names, molecules, r, CONF = alanine_octapeptide
     config = Config(
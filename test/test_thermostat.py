@@ -4,7 +4,9 @@ import warnings
 import pmesh
 from mpi4py import MPI
 from hymd.input_parser import Config, _find_unique_names
-from hymd.thermostat import csvr_thermostat
+from hymd.thermostat import (
+    csvr_thermostat, RandomBatches, _random_chi_squared,
+)
 from hymd.field import domain_decomposition
 from hymd.file_io import distribute_input
 
@@ -160,3 +162,11 @@ def test_thermostat_coupling_groups(molecules_with_solvent):
     # assert K_group_D == pytest.approx(45.41754237593906, abs=1e-13)
     # assert config.thermostat_work == pytest.approx(0.5710542121164457,
     #                                                abs=1e-13)
+
+
+@pytest.mark.parametrize("M", [20, 3000])
+def test_random_chi_squared(M):
+    RandomBatches.seed(12345)
+    x = np.array([_random_chi_squared(M) for _ in range(20000)])
+    assert np.mean(x) == pytest.approx(M, rel=5 * np.sqrt(2 / M / x.size))
+    assert np.var(x) == pytest.approx(2 * M, rel=0.05)